@@ -5,38 +5,124 @@ Returns separate prediction sets for each model.
 
 import os
 import json
+import random
+import asyncio
+import hashlib
 import logging
-import concurrent.futures
+from functools import lru_cache
+
+try:
+    import redis as _redis
+except ImportError:
+    _redis = None
 
 logger = logging.getLogger(__name__)
 
+# LLM responses for an identical prompt are reusable within a session —
+# cache them briefly so re-runs don't re-pay model latency and API quota.
+CACHE_TTL_SECONDS = 900
+
+_redis_client = None
+
+
+def _get_redis():
+    """Return a Redis client if redis is installed and REDIS_URL is set, else None."""
+    global _redis_client
+    if _redis is None:
+        return None
+    url = os.getenv("REDIS_URL")
+    if not url:
+        return None
+    if _redis_client is None:
+        try:
+            _redis_client = _redis.Redis.from_url(url, socket_timeout=2)
+        except Exception as e:
+            logger.warning(f"Redis unavailable — running without LLM cache: {e}")
+            return None
+    return _redis_client
+
+
+async def _cached_call(model_name: str, prompt: str, runner) -> dict | None:
+    """Serve predictions from Redis on a recent identical prompt, else call the model."""
+    client = _get_redis()
+    key = f"stockcast:{model_name}:{hashlib.blake2b(prompt.encode()).hexdigest()}"
+
+    if client is not None:
+        try:
+            cached = client.get(key)
+            if cached:
+                logger.info(f"[{model_name}] Serving cached predictions (prompt unchanged).")
+                return json.loads(cached)
+        except Exception as e:
+            logger.warning(f"Redis read failed — falling through to API call: {e}")
+
+    result = await runner(prompt)
+
+    if result and client is not None:
+        try:
+            client.setex(key, CACHE_TTL_SECONDS, json.dumps(result))
+        except Exception as e:
+            logger.warning(f"Redis write failed: {e}")
+
+    return result
+
 
 def build_prompt(stock_data: dict, news: dict) -> str:
-    """Build the shared analysis prompt for both models."""
-    stock_lines = []
-    for ticker, d in stock_data.items():
-        stock_lines.append(
-            f"{ticker}: price=${d['current_price']}, "
-            f"1d={d['daily_change_pct']:+.1f}%, "
-            f"1w={d['weekly_change_pct']:+.1f}%, "
-            f"1m={d['monthly_change_pct']:+.1f}%, "
-            f"vol_ratio={d['volume_ratio']:.1f}x, "
-            f"momentum={d['momentum_score']:.0f}/100"
-        )
+    """
+    Build the shared analysis prompt for both models.
+    Memoized on frozen inputs so retries and re-runs within one process
+    skip the per-ticker string build when the data hasn't changed.
+    """
+    stocks_key = tuple((t, tuple(sorted(d.items()))) for t, d in sorted(stock_data.items()))
+    macro_key  = tuple(news.get("macro", [])[:15])
+    sector_key = tuple(
+        (sector, tuple(headlines[:4]))
+        for sector, headlines in news.get("sector", {}).items()
+    )
+    return _build_prompt_cached(stocks_key, macro_key, sector_key)
 
-    stocks_block    = "\n".join(stock_lines)
-    macro_headlines = "\n".join(f"- {h}" for h in news.get("macro", [])[:15])
+
+# Compact CSV rows instead of labeled fields — same information, 2-3x fewer
+# prompt tokens, so LLM prefill time and cost drop proportionally.
+_STOCK_LINE_FMT = "{},{:.0f},{:.0f},{:.0f},{:.0f},{:.1f},{:.0f}"
+
+
+@lru_cache(maxsize=4)
+def _build_prompt_cached(stocks_key: tuple, macro_key: tuple, sector_key: tuple) -> str:
+    stocks_block = "\n".join(
+        _STOCK_LINE_FMT.format(
+            ticker,
+            d["current_price"],
+            d["daily_change_pct"],
+            d["weekly_change_pct"],
+            d["monthly_change_pct"],
+            d["volume_ratio"],
+            d["momentum_score"],
+        )
+        for ticker, d in ((t, dict(items)) for t, items in stocks_key)
+    )
+    macro_headlines = "\n".join(f"- {h}" for h in macro_key)
     sector_blocks   = ""
-    for sector, headlines in news.get("sector", {}).items():
+    for sector, headlines in sector_key:
         if headlines:
             sector_blocks += f"\n{sector.upper()}:\n"
-            sector_blocks += "\n".join(f"  - {h}" for h in headlines[:4])
+            sector_blocks += "\n".join(f"  - {h}" for h in headlines)
+
+    return _PROMPT_TMPL.format(
+        stocks_block=stocks_block,
+        macro_headlines=macro_headlines,
+        sector_blocks=sector_blocks,
+    )
 
-    prompt = f"""You are a quantitative stock market analyst. Based on the following market data and news, predict which stocks are most likely to move significantly today.
+
+# Static prompt skeleton, built once at import. The JSON example braces stay
+# double-escaped so .format only substitutes the three named fields.
+_PROMPT_TMPL = """You are a quantitative stock market analyst. Based on the following market data and news, predict which stocks are most likely to move significantly today.
 
 === STOCK UNIVERSE DATA ===
-(Format: ticker: current price, 1-day change, 1-week change, 1-month change, volume ratio vs 30d avg, momentum score 0-100)
+(CSV columns: ticker, current price $, 1-day change %, 1-week change %, 1-month change %, volume ratio vs 30d avg, momentum score 0-100)
 
+ticker,price,1d%,1w%,1m%,volr,mom
 {stocks_block}
 
 === MACRO & GEOPOLITICAL NEWS ===
@@ -92,28 +178,43 @@ Rules:
 - Only pick tickers from the stock universe provided
 - Return ONLY the JSON object, no markdown, no explanation
 """
-    return prompt
+
+
+def _backoff_delay(exc: Exception, attempt: int, base: float = 15.0, cap: float = 60.0) -> float:
+    """
+    Full-jitter exponential backoff delay for rate-limit retries.
+    Honors a Retry-After header if the SDK exception exposes one.
+    """
+    response = getattr(exc, "response", None)
+    if response is not None:
+        try:
+            return float(response.headers["retry-after"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            pass
+    return random.uniform(0, min(cap, base * 2 ** attempt))
 
 
 def _parse_response(raw: str) -> dict | None:
-    """Strip markdown fences and parse JSON response."""
-    raw = raw.strip()
-    if raw.startswith("```"):
-        raw = raw.split("```")[1]
-        if raw.startswith("json"):
-            raw = raw[4:]
-        raw = raw.strip()
+    """
+    Extract and validate the first JSON object in the response.
+    raw_decode tolerates markdown fences before the object and trailing
+    prose after it — both common LLM habits that strict json.loads rejects,
+    discarding an otherwise valid prediction set.
+    """
     try:
-        predictions = json.loads(raw)
+        start = raw.find("{")
+        if start == -1:
+            raise ValueError("no JSON object found in response")
+        predictions, _ = json.JSONDecoder().raw_decode(raw, start)
         assert "winners" in predictions and len(predictions["winners"]) == 10
         assert "losers"  in predictions and len(predictions["losers"])  == 10
         return predictions
-    except (json.JSONDecodeError, AssertionError) as e:
+    except (json.JSONDecodeError, AssertionError, ValueError) as e:
         logger.error(f"Parse/validation failed: {e}")
         return None
 
 
-def _run_claude(prompt: str) -> dict | None:
+async def _run_claude(prompt: str) -> dict | None:
     """Call Anthropic Claude API and return parsed predictions."""
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
@@ -121,40 +222,51 @@ def _run_claude(prompt: str) -> dict | None:
         return None
     try:
         import anthropic
-        client  = anthropic.Anthropic(api_key=api_key)
-        logger.info("[Claude] Sending request...")
-        message = client.messages.create(
-            model="claude-opus-4-6",
-            max_tokens=2048,
-            messages=[{"role": "user", "content": prompt}],
-        )
-        raw = message.content[0].text
-        logger.info("[Claude] Response received.")
-        result = _parse_response(raw)
-        if result:
-            result["model"] = "claude"
-        return result
+        client  = anthropic.AsyncAnthropic(api_key=api_key)
+
+        for attempt in range(3):  # up to 3 attempts
+            try:
+                logger.info(f"[Claude] Sending request (streaming, attempt {attempt + 1})...")
+                async with client.messages.stream(
+                    model="claude-opus-4-6",
+                    max_tokens=2048,
+                    messages=[{"role": "user", "content": prompt}],
+                ) as stream:
+                    raw = "".join([text async for text in stream.text_stream])
+                logger.info("[Claude] Stream complete.")
+                result = _parse_response(raw)
+                if result:
+                    result["model"] = "claude"
+                return result
+            except Exception as e:
+                err_str = str(e)
+                if ("429" in err_str or "529" in err_str) and attempt < 2:
+                    wait = _backoff_delay(e, attempt)
+                    logger.warning(f"[Claude] Rate limited/overloaded. Waiting {wait:.1f}s before retry...")
+                    await asyncio.sleep(wait)
+                else:
+                    raise
     except Exception as e:
         logger.error(f"[Claude] API call failed: {e}")
         return None
 
 
-def _run_gemini(prompt: str) -> dict | None:
+async def _run_gemini(prompt: str) -> dict | None:
     """Call Google Gemini API and return parsed predictions. Retries once on 429."""
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         logger.error("GEMINI_API_KEY not set — skipping Gemini")
         return None
     try:
-        import time
         from google import genai
         from google.genai import types
         client = genai.Client(api_key=api_key)
 
         for attempt in range(3):  # up to 3 attempts
             try:
-                logger.info(f"[Gemini] Sending request (attempt {attempt + 1})...")
-                response = client.models.generate_content(
+                logger.info(f"[Gemini] Sending request (streaming, attempt {attempt + 1})...")
+                chunks = []
+                async for chunk in await client.aio.models.generate_content_stream(
                     model="gemini-2.5-flash",
                     contents=prompt,
                     config=types.GenerateContentConfig(
@@ -162,9 +274,11 @@ def _run_gemini(prompt: str) -> dict | None:
                         max_output_tokens=2048,
                         thinking_config=types.ThinkingConfig(thinking_budget=0),
                     )
-                )
-                raw = response.text
-                logger.info("[Gemini] Response received.")
+                ):
+                    if chunk.text:
+                        chunks.append(chunk.text)
+                raw = "".join(chunks)
+                logger.info("[Gemini] Stream complete.")
                 result = _parse_response(raw)
                 if result:
                     result["model"] = "gemini"
@@ -172,9 +286,9 @@ def _run_gemini(prompt: str) -> dict | None:
             except Exception as e:
                 err_str = str(e)
                 if "429" in err_str and attempt < 2:
-                    wait = 30 * (attempt + 1)
-                    logger.warning(f"[Gemini] Rate limited (429). Waiting {wait}s before retry...")
-                    time.sleep(wait)
+                    wait = _backoff_delay(e, attempt)
+                    logger.warning(f"[Gemini] Rate limited (429). Waiting {wait:.1f}s before retry...")
+                    await asyncio.sleep(wait)
                 else:
                     raise
     except Exception as e:
@@ -190,12 +304,14 @@ def analyze(stock_data: dict, news: dict) -> dict | None:
     """
     prompt = build_prompt(stock_data, news)
 
-    # Run both models concurrently
-    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-        future_claude = executor.submit(_run_claude, prompt)
-        future_gemini = executor.submit(_run_gemini, prompt)
-        claude_result = future_claude.result()
-        gemini_result = future_gemini.result()
+    # Run both models concurrently on one event loop
+    async def _run_both():
+        return await asyncio.gather(
+            _cached_call("claude", prompt, _run_claude),
+            _cached_call("gemini", prompt, _run_gemini),
+        )
+
+    claude_result, gemini_result = asyncio.run(_run_both())
 
     if claude_result:
         logger.info("[Claude] Predictions parsed and validated.")
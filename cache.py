@@ -0,0 +1,68 @@
+"""
+cache.py — File-backed TTL cache for API responses.
+
+Each pipeline run re-downloads 90 days of history per ticker even though
+all but the newest bar is unchanged from the previous run. Caching the
+parsed payloads on disk lets warm re-runs (same trading day) skip the
+network entirely.
+"""
+
+import os
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 12 * 3600  # daily bars go stale after half a day
+
+
+class FileCache:
+    """Tiny JSON-on-disk cache: one file per (source, key), TTL on read."""
+
+    def __init__(self, root: str = ".cache", ttl: int = DEFAULT_TTL_SECONDS):
+        self.root = root
+        self.ttl  = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, source: str, key: str) -> str:
+        return os.path.join(self.root, source, f"{key}.json")
+
+    def get(self, source: str, key: str):
+        """Return the cached payload, or None on miss/expiry/corruption."""
+        path = self._path(source, key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            if time.time() - entry["ts"] > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry["data"]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+    def set(self, source: str, key: str, data) -> None:
+        """Write a payload atomically (.tmp + os.replace) so readers never see partial files."""
+        path = self._path(source, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"ts": time.time(), "data": data}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Cache write failed for {source}/{key}: {e}")
+
+    def clear(self, source: str | None = None) -> None:
+        """Drop all entries, or just one source's. For debugging stale data."""
+        import shutil
+        target = os.path.join(self.root, source) if source else self.root
+        shutil.rmtree(target, ignore_errors=True)
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        ratio = (self.hits / total * 100) if total else 0.0
+        return f"{self.hits}/{total} hits ({ratio:.0f}%)"
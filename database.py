@@ -25,13 +25,17 @@ CREATE TABLE actuals (
 
 import os
 import logging
+from collections import defaultdict
 from datetime import date, timedelta
+from functools import lru_cache
 from supabase import create_client, Client
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_client() -> Client:
+    """Create the Supabase client once and reuse it (keeps the httpx pool warm)."""
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_KEY")
     if not url or not key:
@@ -55,8 +59,13 @@ def save_predictions(predictions: dict) -> bool:
             "losers": predictions["losers"],
         }
 
-        # Upsert — insert or update if date already exists
-        result = client.table("predictions").upsert(data, on_conflict="date").execute()
+        # Upsert — insert or update if date already exists.
+        # returning="minimal" skips serializing and parsing the echoed rows.
+        try:
+            client.table("predictions").upsert(data, on_conflict="date", returning="minimal").execute()
+        except TypeError:
+            # older supabase-py without the returning kwarg
+            client.table("predictions").upsert(data, on_conflict="date").execute()
         logger.info(f"Saved predictions for {today} to Supabase.")
         return True
 
@@ -74,32 +83,28 @@ def save_actuals(date_str: str, actuals_map: dict, predictions: dict) -> bool:
     """
     try:
         client = get_client()
-        rows = []
-
-        for entry in predictions.get("winners", []):
-            ticker = entry["ticker"]
-            if ticker in actuals_map:
-                rows.append({
-                    "date": date_str,
-                    "ticker": ticker,
-                    "predicted_change_pct": entry["predicted_change_pct"],
-                    "actual_change_pct": actuals_map[ticker],
-                    "prediction_type": "winner",
-                })
-
-        for entry in predictions.get("losers", []):
-            ticker = entry["ticker"]
-            if ticker in actuals_map:
-                rows.append({
-                    "date": date_str,
-                    "ticker": ticker,
-                    "predicted_change_pct": entry["predicted_change_pct"],
-                    "actual_change_pct": actuals_map[ticker],
-                    "prediction_type": "loser",
-                })
+
+        rows = [
+            {
+                "date": date_str,
+                "ticker": entry["ticker"],
+                "predicted_change_pct": entry["predicted_change_pct"],
+                "actual_change_pct": actuals_map[entry["ticker"]],
+                "prediction_type": prediction_type,
+            }
+            for prediction_type, entries in (
+                ("winner", predictions.get("winners", [])),
+                ("loser",  predictions.get("losers",  [])),
+            )
+            for entry in entries
+            if entry["ticker"] in actuals_map
+        ]
 
         if rows:
-            client.table("actuals").upsert(rows, on_conflict="date,ticker").execute()
+            try:
+                client.table("actuals").upsert(rows, on_conflict="date,ticker", returning="minimal").execute()
+            except TypeError:
+                client.table("actuals").upsert(rows, on_conflict="date,ticker").execute()
             logger.info(f"Saved {len(rows)} actual results for {date_str}.")
         return True
 
@@ -159,13 +164,23 @@ def get_recent_history(days: int = 30) -> list:
             .execute()
         )
 
+        # One query for all actuals in the window, grouped by date in Python —
+        # avoids an N+1 round-trip per history day.
+        actuals_result = (
+            client.table("actuals")
+            .select("*")
+            .gte("date", from_date)
+            .execute()
+        )
+        actuals_by_date = defaultdict(dict)
+        for a in actuals_result.data or []:
+            actuals_by_date[a["date"]][a["ticker"]] = a
+
         history = []
         for record in result.data or []:
-            actuals = get_actuals_for_date(record["date"])
-            actuals_map = {a["ticker"]: a for a in actuals}
             history.append({
                 **record,
-                "actuals": actuals_map,
+                "actuals": actuals_by_date.get(record["date"], {}),
             })
 
         return history
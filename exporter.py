@@ -3,40 +3,119 @@ exporter.py — Generates the data.json file that the frontend reads.
 This file is the bridge between the backend and the static frontend.
 """
 
+import gzip
 import json
 import os
+import shutil
 import logging
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+_CST = ZoneInfo("America/Chicago")  # loaded once; tzdata parse is not free
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
+def _composite_scores(items: list) -> np.ndarray:
+    """Vectorized composite score: momentum + volume signal + weekly trend."""
+    arr = np.array(
+        [
+            (
+                d.get("momentum_score", 50),
+                d.get("volume_ratio", 1.0),
+                d.get("weekly_change_pct", 0),
+            )
+            for _, d in items
+        ],
+        dtype=np.float64,
+    )
+    return np.round(
+        arr[:, 0] * 0.4 + np.minimum(arr[:, 1] * 10, 30) * 0.3 + arr[:, 2] * 0.6,
+        2,
+    )
+
+
+def _ranked_entries(items: list, scores, order) -> list:
+    return [
+        {
+            "ticker": items[i][0],
+            "current_price": items[i][1].get("current_price"),
+            "daily_change_pct": items[i][1].get("daily_change_pct"),
+            "weekly_change_pct": items[i][1].get("weekly_change_pct"),
+            "monthly_change_pct": items[i][1].get("monthly_change_pct"),
+            "volume_ratio": items[i][1].get("volume_ratio"),
+            "momentum_score": items[i][1].get("momentum_score"),
+            "composite_score": scores[i],
+        }
+        for i in order
+    ]
+
+
 def build_full_ranked_list(stock_data: dict) -> list:
     """
     Build a full ranked list of all stocks by momentum + volume signal.
     Used for the downloadable CSV — gives users the complete picture
     beyond just the top 10 shown on screen.
     """
-    ranked = []
-    for ticker, d in stock_data.items():
-        # Simple composite score: momentum + volume signal + weekly trend
-        score = (
-            d.get("momentum_score", 50) * 0.4 +
-            min(d.get("volume_ratio", 1.0) * 10, 30) * 0.3 +
-            (d.get("weekly_change_pct", 0) * 2) * 0.3
-        )
-        ranked.append({
-            "ticker": ticker,
-            "current_price": d.get("current_price"),
-            "daily_change_pct": d.get("daily_change_pct"),
-            "weekly_change_pct": d.get("weekly_change_pct"),
-            "monthly_change_pct": d.get("monthly_change_pct"),
-            "volume_ratio": d.get("volume_ratio"),
-            "momentum_score": d.get("momentum_score"),
-            "composite_score": round(score, 2),
-        })
-    ranked.sort(key=lambda x: x["composite_score"], reverse=True)
-    return ranked
+    if not stock_data:
+        return []
+    items  = list(stock_data.items())
+    scores = _composite_scores(items)
+    order  = np.argsort(-scores, kind="stable")
+    return _ranked_entries(items, scores.tolist(), order)
+
+
+def build_top_k(stock_data: dict, k: int = 10) -> list:
+    """
+    Return only the k highest-composite-score stocks. argpartition selects
+    the top k in O(N), then sorts just those k — cheaper than ranking the
+    whole universe when a caller needs a short movers list.
+    """
+    if not stock_data:
+        return []
+    items  = list(stock_data.items())
+    scores = _composite_scores(items)
+    if k >= len(items):
+        order = np.argsort(-scores, kind="stable")
+    else:
+        idx   = np.argpartition(-scores, k)[:k]
+        order = idx[np.argsort(-scores[idx], kind="stable")]
+    return _ranked_entries(items, scores.tolist(), order)
+
+
+def _enrich_entry(entry: dict, actual: float | None, prediction_type: str) -> dict:
+    """Attach actual result + accuracy/outcome fields to one prediction entry."""
+    accuracy = None
+    if actual is not None:
+        predicted     = entry["predicted_change_pct"]
+        abs_predicted = abs(predicted)
+        abs_actual    = abs(actual)
+        # Same sign iff the product is positive — one compare, no branches
+        if predicted * actual > 0:
+            diff            = abs(abs_predicted - abs_actual)
+            magnitude_score = max(0, 50 - (diff * 10))
+            accuracy        = round(50 + magnitude_score)
+            outcome         = "beat" if abs_actual > abs_predicted else "close"
+        else:
+            accuracy = max(0, round(50 - abs(actual - predicted) * 5))
+            outcome  = "miss"
+    else:
+        outcome = "pending"
+
+    return {
+        **entry,
+        "prediction_type": prediction_type,
+        "actual_change_pct": actual,
+        "accuracy_score": accuracy,
+        "outcome": outcome,
+    }
 
 
 def build_frontend_json(
@@ -56,58 +135,34 @@ def build_frontend_json(
     # Build actuals lookup
     actuals_map = {a["ticker"]: a["actual_change_pct"] for a in yesterday_actuals}
 
+    today_iso     = date.today().isoformat()
+    yesterday_iso = (date.today() - timedelta(days=1)).isoformat()
+
     def enrich_with_actuals(entries: list, prediction_type: str) -> list:
-        enriched = []
-        for entry in entries:
-            ticker   = entry["ticker"]
-            actual   = actuals_map.get(ticker)
-            accuracy = None
-
-            if actual is not None:
-                predicted         = entry["predicted_change_pct"]
-                direction_correct = (predicted > 0 and actual > 0) or (predicted < 0 and actual < 0)
-                if direction_correct:
-                    diff           = abs(abs(predicted) - abs(actual))
-                    magnitude_score = max(0, 50 - (diff * 10))
-                    accuracy       = round(50 + magnitude_score)
-                else:
-                    accuracy = max(0, round(50 - abs(actual - predicted) * 5))
-
-                outcome = "beat" if abs(actual) > abs(predicted) and direction_correct else \
-                          "miss" if not direction_correct else "close"
-            else:
-                outcome = "pending"
-
-            enriched.append({
-                **entry,
-                "prediction_type": prediction_type,
-                "actual_change_pct": actual,
-                "accuracy_score": accuracy,
-                "outcome": outcome,
-            })
-        return enriched
+        get_actual = actuals_map.get  # bound once, not re-looked-up per entry
+        return [_enrich_entry(e, get_actual(e["ticker"]), prediction_type) for e in entries]
 
     # Enrich yesterday for each model separately
     def build_yesterday_block(preds: dict | None) -> dict:
         if not preds:
             return {"winners": [], "losers": [], "has_actuals": False}
         return {
-            "date":        (date.today() - timedelta(days=1)).isoformat(),
+            "date":        yesterday_iso,
             "winners":     enrich_with_actuals(preds.get("winners", []), "winner"),
             "losers":      enrich_with_actuals(preds.get("losers",  []), "loser"),
             "has_actuals": len(actuals_map) > 0,
         }
 
-    from datetime import datetime
-    import pytz
-    cst      = pytz.timezone("America/Chicago")
-    now_cst  = datetime.now(cst)
-    generated_at = now_cst.strftime("%Y-%m-%dT%H:%M:%S%z")
+    generated_at = datetime.now(_CST).isoformat(timespec="seconds")
+
+    # Both models currently share yesterday's stored predictions, so build
+    # the enriched block once and reference it from both keys.
+    yesterday_block = build_yesterday_block(yesterday_predictions)
 
     payload = {
         "generated_at": generated_at,
         "today": {
-            "date": date.today().isoformat(),
+            "date": today_iso,
             "claude": {
                 "market_summary": claude_predictions.get("market_summary", "") if claude_predictions else None,
                 "winners":        claude_predictions.get("winners", [])         if claude_predictions else [],
@@ -122,9 +177,9 @@ def build_frontend_json(
             },
         },
         "yesterday": {
-            "date":   (date.today() - timedelta(days=1)).isoformat(),
-            "claude": build_yesterday_block(yesterday_predictions),
-            "gemini": build_yesterday_block(yesterday_predictions),  # same actuals, different predictions will be stored later
+            "date":   yesterday_iso,
+            "claude": yesterday_block,
+            "gemini": yesterday_block,  # same actuals, different predictions will be stored later
         },
         "indices":          index_data,
         "full_ranked_list": build_full_ranked_list(stock_data) if stock_data else [],
@@ -134,12 +189,23 @@ def build_frontend_json(
 
 
 def write_json(payload: dict) -> bool:
-    """Write the payload to data.json."""
+    """
+    Write the payload to data.json. Uses orjson when available (3-10x faster).
+    Writes to a .tmp file and os.replace()s it into place, so anything
+    serving data.json never sees a half-written file.
+    """
     output_path = os.getenv("OUTPUT_JSON_PATH", "./data.json")
+    tmp_path    = output_path + ".tmp"
 
     try:
-        with open(output_path, "w") as f:
-            json.dump(payload, f, indent=2, default=str)
+        if orjson is not None:
+            with open(tmp_path, "wb") as f:
+                _write_sections(f, payload)
+        else:
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f, indent=2, default=str)
+        os.replace(tmp_path, output_path)
+        _write_gzip(output_path)
         logger.info(f"data.json written to {output_path}")
         return True
     except Exception as e:
@@ -147,13 +213,47 @@ def write_json(payload: dict) -> bool:
         return False
 
 
+def _write_sections(f, payload: dict) -> None:
+    """
+    Serialize and write one top-level section at a time instead of
+    materializing the whole indented payload (full_ranked_list can be
+    hundreds of rows) as a single buffer in memory.
+    """
+    opts = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    f.write(b"{\n")
+    for i, (key, section) in enumerate(payload.items()):
+        if i:
+            f.write(b",\n")
+        f.write(orjson.dumps(key))
+        f.write(b": ")
+        f.write(orjson.dumps(section, default=str, option=opts))
+    f.write(b"\n}")
+
+
+def _write_gzip(output_path: str) -> None:
+    """
+    Write data.json.gz next to data.json so the CDN/web server can serve
+    pre-compressed responses (Content-Encoding: gzip). JSON compresses
+    5-10x, so the frontend download shrinks proportionally.
+    """
+    try:
+        tmp = output_path + ".gz.tmp"
+        with open(output_path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp, output_path + ".gz")
+    except Exception as e:
+        logger.warning(f"Failed to write {output_path}.gz: {e}")
+
+
 def fetch_index_data() -> dict:
     """
     Fetch S&P 500, NASDAQ, DOW from Financial Modeling Prep API.
     Uses the same FMP key already in use for stock fallback.
+    The three quotes are independent, so they're fetched in parallel.
     """
     import os
     import requests
+    from concurrent.futures import ThreadPoolExecutor
 
     fmp_key = os.getenv("FMP_API_KEY")
     if not fmp_key:
@@ -161,9 +261,8 @@ def fetch_index_data() -> dict:
         return {k: {"value": None, "change_pct": None, "direction": "neutral"} for k in ["sp500", "nasdaq", "dow"]}
 
     indices = {"sp500": "%5EGSPC", "nasdaq": "%5EIXIC", "dow": "%5EDJI"}
-    result  = {}
 
-    for name, symbol in indices.items():
+    def _fetch_one(name: str, symbol: str) -> tuple:
         try:
             url  = f"https://financialmodelingprep.com/api/v3/quote/{symbol}"
             resp = requests.get(url, params={"apikey": fmp_key}, timeout=15)
@@ -174,15 +273,16 @@ def fetch_index_data() -> dict:
                 price      = item.get("price")
                 change_pct = item.get("changesPercentage")
                 if price is not None:
-                    result[name] = {
+                    return name, {
                         "value":      round(float(price), 2),
                         "change_pct": round(float(change_pct), 2) if change_pct is not None else None,
                         "direction":  "up" if (change_pct or 0) >= 0 else "down",
                     }
-                    continue
-            result[name] = {"value": None, "change_pct": None, "direction": "neutral"}
         except Exception as e:
             logger.warning(f"FMP index fetch failed for {name}: {e}")
-            result[name] = {"value": None, "change_pct": None, "direction": "neutral"}
+        return name, {"value": None, "change_pct": None, "direction": "neutral"}
+
+    with ThreadPoolExecutor(max_workers=len(indices)) as executor:
+        result = dict(executor.map(lambda kv: _fetch_one(*kv), indices.items()))
 
     return result
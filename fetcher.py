@@ -6,16 +6,29 @@ Aborts pipeline if more than 100 tickers fail both sources.
 
 import os
 import time
+import bisect
 import random
+import asyncio
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from cache import FileCache
 
 logger = logging.getLogger(__name__)
 
+# Warm re-runs within the same trading day serve price history from disk
+_CACHE = FileCache()
+# Keyed by (ticker, date) — a settled close is immutable, so a long TTL is safe
+_ACTUALS_CACHE = FileCache(ttl=30 * 24 * 3600)
+
 # ── Session setup ──────────────────────────────────────────────────────────────
 try:
     from curl_cffi import requests as curl_requests
     _SESSION = curl_requests.Session(impersonate="chrome110")
+    _HAS_CURL_CFFI = True
     logger.info("Using curl_cffi Chrome impersonation session")
 except ImportError:
     import requests as curl_requests
@@ -23,12 +36,46 @@ except ImportError:
     _SESSION.headers.update({
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
     })
+    _HAS_CURL_CFFI = False
     logger.warning("curl_cffi not available, falling back to requests")
 
+# Cap concurrent Yahoo requests — enough to hide RTT, low enough to stay polite
+MAX_CONCURRENT_REQUESTS = 16
+
 import requests as _std_requests  # standard requests for FMP (no TLS spoofing needed)
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One keep-alive session for all FMP calls — reuses the TLS connection and
+# retries transient failures with backoff instead of hand-rolled sleeps.
+_FMP_SESSION = _std_requests.Session()
+_FMP_SESSION.headers.update({"Accept": "application/json"})
+_FMP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+if not _HAS_CURL_CFFI:
+    # Plain requests defaults to a 10-connection pool; pre-size it so the
+    # to_thread fan-out doesn't serialize on urllib3's pool. curl_cffi
+    # manages its own multiplexed connections, so it needs no mount.
+    _SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+try:
+    import orjson
+
+    def _loads(resp):
+        """Parse a response body with orjson — bytes in, no intermediate str decode."""
+        return orjson.loads(resp.content)
+except ImportError:
+    def _loads(resp):
+        return resp.json()
 
 # ── API settings ───────────────────────────────────────────────────────────────
-YF_BASE = "https://query1.finance.yahoo.com/v8/finance/chart/"
+YF_BASE  = "https://query1.finance.yahoo.com/v8/finance/chart/"
+YF_SPARK = "https://query1.finance.yahoo.com/v8/finance/spark"
+SPARK_BATCH_SIZE = 20  # spark accepts up to ~20 symbols per request
 YF_HEADERS = {
     "Accept": "application/json",
     "Accept-Language": "en-US,en;q=0.9",
@@ -36,6 +83,7 @@ YF_HEADERS = {
     "Origin": "https://finance.yahoo.com",
 }
 FMP_BASE = "https://financialmodelingprep.com/api/v3"
+_SESSION.headers.update(YF_HEADERS)  # set once; not re-built per request
 ABORT_THRESHOLD = 100  # abort pipeline if more than this many tickers fail both sources
 
 # ── Stock universe ─────────────────────────────────────────────────────────────
@@ -81,77 +129,208 @@ STOCK_UNIVERSE = [
     # Biotech high volatility
     "SRPT", "EXAS", "BEAM", "EDIT",
 ]
-STOCK_UNIVERSE = list(dict.fromkeys(STOCK_UNIVERSE))
+# Dedup once at import, keep order; the frozenset serves O(1) membership checks
+STOCK_UNIVERSE = tuple(dict.fromkeys(STOCK_UNIVERSE))
+STOCK_UNIVERSE_SET = frozenset(STOCK_UNIVERSE)
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
-def _compute_metrics(closes: list, volumes: list) -> dict:
-    """Compute all derived metrics from a list of closes and volumes."""
-    current_price = closes[-1]
-    prev_close    = closes[-2]
-    week_ago      = closes[-6]  if len(closes) >= 6  else prev_close
-    month_ago     = closes[-22] if len(closes) >= 22 else prev_close
-
-    daily_change_pct   = ((current_price - prev_close) / prev_close) * 100
-    weekly_change_pct  = ((current_price - week_ago)   / week_ago)   * 100
-    monthly_change_pct = ((current_price - month_ago)  / month_ago)  * 100
-
-    avg_volume    = sum(volumes[-20:]) / len(volumes[-20:]) if len(volumes) >= 20 else (sum(volumes) / len(volumes) if volumes else 1)
-    recent_volume = volumes[-1] if volumes else 0
-    volume_ratio  = recent_volume / avg_volume if avg_volume > 0 else 1.0
-
-    momentum_score = 50
-    momentum_score += max(-20, min(20, daily_change_pct   * 5))
-    momentum_score += max(-15, min(15, weekly_change_pct  * 2))
-    momentum_score += max(-15, min(15, monthly_change_pct))
-    if volume_ratio > 1.5:
-        momentum_score += min((volume_ratio - 1) * 5, 10)
-    momentum_score = max(0, min(100, momentum_score))
+class TokenBucket:
+    """
+    Blocking token-bucket rate limiter. acquire() only sleeps when the
+    bucket is empty, unlike the fixed per-request sleeps it replaces.
+    429 Retry-After handling is covered by the session's urllib3 Retry.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate     = rate        # tokens per second
+        self.capacity = capacity
+        self.tokens   = capacity
+        self.updated  = time.monotonic()
+
+    def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) / self.rate)
+
+
+# FMP's documented free-tier limit is ~300 req/min; pace at 5/s
+_FMP_BUCKET = TokenBucket(rate=5.0, capacity=5)
+
+
+def _compute_metrics_batch(raws: dict) -> dict:
+    """
+    Compute all derived metrics for every ticker at once with NumPy.
+    Series are right-aligned into NaN-padded (N, T) matrices, so a series
+    shorter than a lookback window naturally falls back to prev_close
+    (NaN at the lookback column) — same semantics as the old per-ticker
+    length checks, without N Python loops.
+
+    raws: {ticker: {"closes": [...], "volumes": [...]}} with >= 5 bars each.
+    Returns {ticker: metrics_dict}.
+    """
+    if not raws:
+        return {}
+
+    tickers = list(raws)
+    n = len(tickers)
+    t_max = max(len(r["closes"]) for r in raws.values())
+    # float32 halves the matrices' memory traffic; cent-level prices fit
+    # comfortably, and lossy reductions upcast to float64 below.
+    closes  = np.full((n, t_max), np.nan, dtype=np.float32)
+    volumes = np.full((n, t_max), np.nan, dtype=np.float32)
+    for i, ticker in enumerate(tickers):
+        c = raws[ticker]["closes"]
+        v = raws[ticker]["volumes"]
+        closes[i, t_max - len(c):]  = c
+        volumes[i, t_max - len(v):] = v
+
+    current = closes[:, -1]
+    prev    = closes[:, -2]
+    week    = closes[:, -6]  if t_max >= 6  else np.full(n, np.nan)
+    month   = closes[:, -22] if t_max >= 22 else np.full(n, np.nan)
+    week    = np.where(np.isnan(week),  prev, week)
+    month   = np.where(np.isnan(month), prev, month)
+
+    daily_pct   = (current - prev)  / prev  * 100
+    weekly_pct  = (current - week)  / week  * 100
+    monthly_pct = (current - month) / month * 100
+
+    # nanmean over the right-aligned tail averages the last 20 bars, or all
+    # available bars for shorter series — matching the old branchy logic.
+    avg_volume    = np.nanmean(volumes[:, -20:], axis=1, dtype=np.float64)
+    recent_volume = np.nan_to_num(volumes[:, -1])
+    volume_ratio  = np.where(avg_volume > 0, recent_volume / np.where(avg_volume > 0, avg_volume, 1), 1.0)
+
+    momentum = (
+        50
+        + np.clip(daily_pct * 5,  -20, 20)
+        + np.clip(weekly_pct * 2, -15, 15)
+        + np.clip(monthly_pct,    -15, 15)
+        + np.where(volume_ratio > 1.5, np.minimum((volume_ratio - 1) * 5, 10), 0)
+    )
+    momentum = np.clip(momentum, 0, 100)
+
+    # Round each column once and unbox to Python scalars in one pass,
+    # instead of ~9 round()/int() builtin calls per ticker.
+    current       = np.round(current.astype(np.float64),      2).tolist()
+    prev          = np.round(prev.astype(np.float64),         2).tolist()
+    daily_pct     = np.round(daily_pct.astype(np.float64),    2).tolist()
+    weekly_pct    = np.round(weekly_pct.astype(np.float64),   2).tolist()
+    monthly_pct   = np.round(monthly_pct.astype(np.float64),  2).tolist()
+    volume_ratio  = np.round(volume_ratio.astype(np.float64), 2).tolist()
+    momentum      = np.round(momentum.astype(np.float64),     1).tolist()
+    avg_volume    = avg_volume.astype(np.int64).tolist()
+    recent_volume = recent_volume.astype(np.int64).tolist()
 
     return {
-        "current_price":       round(current_price, 2),
-        "prev_close":          round(prev_close, 2),
-        "daily_change_pct":    round(daily_change_pct, 2),
-        "weekly_change_pct":   round(weekly_change_pct, 2),
-        "monthly_change_pct":  round(monthly_change_pct, 2),
-        "volume_ratio":        round(volume_ratio, 2),
-        "momentum_score":      round(momentum_score, 1),
-        "avg_volume":          int(avg_volume),
-        "recent_volume":       int(recent_volume),
+        ticker: {
+            "current_price":       current[i],
+            "prev_close":          prev[i],
+            "daily_change_pct":    daily_pct[i],
+            "weekly_change_pct":   weekly_pct[i],
+            "monthly_change_pct":  monthly_pct[i],
+            "volume_ratio":        volume_ratio[i],
+            "momentum_score":      momentum[i],
+            "avg_volume":          avg_volume[i],
+            "recent_volume":       recent_volume[i],
+        }
+        for i, ticker in enumerate(tickers)
     }
 
 
 # ── Primary source: Yahoo Finance v8 API ──────────────────────────────────────
-def _fetch_yf(ticker: str, days: int = 90) -> dict | None:
-    """Fetch OHLCV from Yahoo Finance v8 API. Returns closes+volumes or None."""
+def _chart_params(days: int) -> dict:
     end_ts   = int(datetime.today().timestamp())
     start_ts = int((datetime.today() - timedelta(days=days)).timestamp())
-    url      = f"{YF_BASE}{ticker}"
-    params   = {"period1": start_ts, "period2": end_ts, "interval": "1d",
-                 "includePrePost": "false", "events": "div,splits"}
+    # events="" — adjclose already folds in splits/dividends, and skipping
+    # the events blob trims every response body. includeAdjustedClose makes
+    # the adjclose series we parse explicit rather than a server default.
+    return {"period1": start_ts, "period2": end_ts, "interval": "1d",
+            "includePrePost": "false", "events": "", "includeAdjustedClose": "true"}
+
+
+def _parse_yf_chart(data: dict) -> dict | None:
+    """Extract clean closes+volumes from a v8 chart response body."""
+    result = data.get("chart", {}).get("result", [])
+    if not result:
+        return None
+    r       = result[0]
+    closes  = r.get("indicators", {}).get("adjclose", [{}])[0].get("adjclose", [])
+    volumes = r.get("indicators", {}).get("quote",    [{}])[0].get("volume",   [])
+    # None becomes NaN in the float arrays, so null bars drop via one mask
+    # instead of a per-bar append loop. Lists out — the payload is JSON-cached.
+    n = min(len(closes), len(volumes))
+    c = np.array(closes[:n],  dtype=np.float64)
+    v = np.nan_to_num(np.array(volumes[:n], dtype=np.float64))
+    mask = ~np.isnan(c)
+    if int(mask.sum()) < 5:
+        return None
+    return {"closes": c[mask].tolist(), "volumes": v[mask].tolist()}
+
+
+def _fetch_yf(ticker: str, days: int = 90, params: dict | None = None) -> dict | None:
+    """Fetch OHLCV from Yahoo Finance v8 API. Returns closes+volumes or None."""
+    cached = _CACHE.get("yf", f"{ticker}_{days}")
+    if cached is not None:
+        return cached
+    if params is None:
+        params = _chart_params(days)
     try:
-        resp = _SESSION.get(url, headers=YF_HEADERS, params=params, timeout=15)
+        resp = _SESSION.get(f"{YF_BASE}{ticker}", params=params, timeout=15)
         if resp.status_code != 200:
             return None
-        data   = resp.json()
-        result = data.get("chart", {}).get("result", [])
-        if not result:
-            return None
-        r      = result[0]
-        closes  = r.get("indicators", {}).get("adjclose", [{}])[0].get("adjclose", [])
-        volumes = r.get("indicators", {}).get("quote",    [{}])[0].get("volume",   [])
-        clean_c, clean_v = [], []
-        for c, v in zip(closes, volumes):
-            if c is not None:
-                clean_c.append(float(c))
-                clean_v.append(float(v) if v is not None else 0.0)
-        if len(clean_c) < 5:
-            return None
-        return {"closes": clean_c, "volumes": clean_v}
+        parsed = _parse_yf_chart(_loads(resp))
+        if parsed:
+            _CACHE.set("yf", f"{ticker}_{days}", parsed)
+        return parsed
     except Exception:
         return None
 
 
+async def _fetch_yf_async(session, semaphore, ticker: str, days: int, params: dict) -> tuple:
+    """
+    Async variant of _fetch_yf, bounded by the shared semaphore.
+    With curl_cffi the AsyncSession keeps Chrome impersonation; without it
+    the sync fetch runs in a worker thread so the fan-out still overlaps I/O.
+    """
+    async with semaphore:
+        if session is None:
+            return ticker, await asyncio.to_thread(_fetch_yf, ticker, days, params)
+        cached = _CACHE.get("yf", f"{ticker}_{days}")
+        if cached is not None:
+            return ticker, cached
+        try:
+            resp = await session.get(f"{YF_BASE}{ticker}", params=params, timeout=15)
+            if resp.status_code != 200:
+                return ticker, None
+            parsed = _parse_yf_chart(_loads(resp))
+            if parsed:
+                _CACHE.set("yf", f"{ticker}_{days}", parsed)
+            return ticker, parsed
+        except Exception:
+            return ticker, None
+
+
+async def _fetch_yf_all(tickers: list, days: int = 90) -> list:
+    """Fetch all tickers concurrently. Returns [(ticker, raw_or_None), ...]."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    params = _chart_params(days)  # same window for every ticker — build once
+    if _HAS_CURL_CFFI:
+        async with curl_requests.AsyncSession(impersonate="chrome110", headers=YF_HEADERS) as session:
+            return await asyncio.gather(
+                *(_fetch_yf_async(session, semaphore, t, days, params) for t in tickers)
+            )
+    return await asyncio.gather(
+        *(_fetch_yf_async(None, semaphore, t, days, params) for t in tickers)
+    )
+
+
 # ── Fallback source: Financial Modeling Prep ──────────────────────────────────
 def _fetch_fmp_single(ticker: str, fmp_key: str) -> dict | None:
     """
@@ -161,10 +340,11 @@ def _fetch_fmp_single(ticker: str, fmp_key: str) -> dict | None:
     url = f"{FMP_BASE}/quote/{ticker}"
     params = {"apikey": fmp_key}
     try:
-        resp = _std_requests.get(url, params=params, timeout=15)
+        _FMP_BUCKET.acquire()
+        resp = _FMP_SESSION.get(url, params=params, timeout=15)
         if resp.status_code != 200:
             return None
-        data = resp.json()
+        data = _loads(resp)
         if not isinstance(data, list) or not data:
             return None
         item = data[0]
@@ -204,7 +384,8 @@ def _fetch_fmp_batch(tickers: list) -> dict:
         url     = f"{FMP_BASE}/quote/{symbols}"
         params  = {"apikey": fmp_key}
         try:
-            resp = _std_requests.get(url, params=params, timeout=15)
+            _FMP_BUCKET.acquire()
+            resp = _FMP_SESSION.get(url, params=params, timeout=15)
             if resp.status_code == 403:
                 logger.warning("[FMP] Bulk endpoint returned 403 — switching to individual requests")
                 bulk_failed = True
@@ -212,7 +393,7 @@ def _fetch_fmp_batch(tickers: list) -> dict:
             if resp.status_code != 200:
                 logger.warning(f"[FMP] Bulk endpoint returned HTTP {resp.status_code}")
                 continue
-            data = resp.json()
+            data = _loads(resp)
             if not isinstance(data, list):
                 continue
             for item in data:
@@ -228,7 +409,6 @@ def _fetch_fmp_batch(tickers: list) -> dict:
                     }
         except Exception as e:
             logger.warning(f"[FMP] Bulk fetch error: {e}")
-        time.sleep(0.5)
 
     # Fall back to individual requests if bulk failed with 403
     if bulk_failed:
@@ -237,10 +417,9 @@ def _fetch_fmp_batch(tickers: list) -> dict:
             raw = _fetch_fmp_single(ticker, fmp_key)
             if raw:
                 results[ticker] = raw
-                logger.info(f"[FMP] ✓ {ticker}")
+                logger.info("[FMP] ✓ %s", ticker)
             else:
-                logger.warning(f"[FMP] ✗ {ticker} — no data")
-            time.sleep(0.3)
+                logger.warning("[FMP] ✗ %s — no data", ticker)
 
     return results
 
@@ -258,10 +437,11 @@ def _fetch_fmp_history(ticker: str, days: int = 90) -> dict | None:
     url    = f"{FMP_BASE}/historical-price-full/{ticker}"
     params = {"from": start_date, "to": end_date, "apikey": fmp_key}
     try:
-        resp = _std_requests.get(url, params=params, timeout=15)
+        _FMP_BUCKET.acquire()
+        resp = _FMP_SESSION.get(url, params=params, timeout=15)
         if resp.status_code != 200:
             return None
-        data    = resp.json()
+        data    = _loads(resp)
         history = data.get("historical", [])
         if len(history) < 5:
             return None
@@ -286,36 +466,29 @@ def fetch_stock_data() -> dict:
     """
     logger.info(f"Fetching data for {len(STOCK_UNIVERSE)} stocks...")
     logger.info("Warming up connection to Yahoo Finance...")
-    time.sleep(2)
+    # Probe request establishes the TCP+TLS session (and any consent
+    # cookies) so the fan-out starts against a warm pool — no fixed sleep.
+    try:
+        _SESSION.get(f"{YF_BASE}AAPL", params={"range": "1d", "interval": "1d"}, timeout=5)
+    except Exception:
+        pass  # warmup is best-effort; real fetches carry their own error handling
 
     stock_data  = {}
     yf_failed   = []
     both_failed = []
 
-    # ── Pass 1: Yahoo Finance ──────────────────────────────────────────
-    batch_size = 20
-    batches = [STOCK_UNIVERSE[i:i + batch_size] for i in range(0, len(STOCK_UNIVERSE), batch_size)]
-
-    for batch_num, batch in enumerate(batches):
-        logger.info(f"[YF] Batch {batch_num + 1}/{len(batches)} ({len(batch)} tickers)...")
-        for ticker in batch:
-            raw = _fetch_yf(ticker)
-            if raw is None:
-                yf_failed.append(ticker)
-                continue
-            try:
-                stock_data[ticker] = _compute_metrics(raw["closes"], raw["volumes"])
-            except Exception as e:
-                logger.warning(f"Could not process {ticker}: {e}")
-                yf_failed.append(ticker)
-            time.sleep(0.3 + random.uniform(0, 0.2))
+    # ── Pass 1: Yahoo Finance (concurrent, bounded by semaphore) ──────
+    results = asyncio.run(_fetch_yf_all(STOCK_UNIVERSE))
+    raws = {}
+    for ticker, raw in results:
+        if raw is None:
+            yf_failed.append(ticker)
+        else:
+            raws[ticker] = raw
 
-        if batch_num < len(batches) - 1:
-            pause = 3 + random.uniform(0, 1)
-            logger.info(f"[YF] Batch {batch_num + 1} done. Pausing {pause:.1f}s...")
-            time.sleep(pause)
+    stock_data = _compute_metrics_batch(raws)
 
-    logger.info(f"[YF] Done. Success: {len(stock_data)}, Failed: {len(yf_failed)}")
+    logger.info(f"[YF] Done. Success: {len(stock_data)}, Failed: {len(yf_failed)}. Cache: {_CACHE.stats()}")
 
     # ── Pass 2: FMP fallback for YF failures ──────────────────────────
     if yf_failed:
@@ -330,14 +503,11 @@ def fetch_stock_data() -> dict:
                 raw = _fetch_fmp_history(ticker)
                 if raw:
                     fmp_results[ticker] = raw
-                time.sleep(0.3)
 
-        for ticker, raw in fmp_results.items():
-            try:
-                stock_data[ticker] = _compute_metrics(raw["closes"], raw["volumes"])
-                logger.info(f"[FMP] Recovered {ticker}")
-            except Exception as e:
-                logger.warning(f"[FMP] Could not process {ticker}: {e}")
+        recovered = _compute_metrics_batch(fmp_results)
+        stock_data.update(recovered)
+        if recovered:
+            logger.info(f"[FMP] Recovered {len(recovered)} tickers: {sorted(recovered)}")
 
         both_failed = [t for t in yf_failed if t not in stock_data]
         if both_failed:
@@ -355,6 +525,100 @@ def fetch_stock_data() -> dict:
 
 
 # ── Actual prices for yesterday's performance ─────────────────────────────────
+def _fetch_yf_spark_batch(tickers: list, range_: str = "1mo") -> dict:
+    """
+    Fetch close series for up to SPARK_BATCH_SIZE tickers in one spark request.
+    Spark carries closes only (no volume), which is all the actuals path needs.
+    Returns {ticker: {"timestamps": [...], "closes": [...]}}.
+    """
+    params = {"symbols": ",".join(tickers), "range": range_, "interval": "1d",
+              "indicators": "close", "includeTimestamps": "true"}
+    series = {}
+    try:
+        resp = _SESSION.get(YF_SPARK, params=params, timeout=15)
+        if resp.status_code != 200:
+            return series
+        data = _loads(resp)
+        if "spark" in data:
+            # Enveloped shape: spark.result[*].response[0]
+            for item in data["spark"].get("result", []) or []:
+                sym = item.get("symbol")
+                r0  = (item.get("response") or [{}])[0]
+                closes = r0.get("indicators", {}).get("quote", [{}])[0].get("close", [])
+                if sym and closes:
+                    series[sym] = {"timestamps": r0.get("timestamp", []), "closes": closes}
+        else:
+            # Flat {symbol: {timestamp, close}} shape
+            for sym, item in data.items():
+                if isinstance(item, dict) and item.get("close"):
+                    series[sym] = {"timestamps": item.get("timestamp", []), "closes": item["close"]}
+    except Exception as e:
+        logger.warning(f"[YF] Spark batch failed: {e}")
+    return series
+
+
+@lru_cache(maxsize=64)
+def _date_window(date_str: str, pre: int = 5, post: int = 2) -> tuple:
+    """(start_ts, end_ts, target_ts) for a target date — cached, since retries
+    and multi-model passes ask for the same date repeatedly."""
+    target = datetime.strptime(date_str, "%Y-%m-%d")
+    return (
+        int((target - timedelta(days=pre)).timestamp()),
+        int((target + timedelta(days=post)).timestamp()),
+        int(target.timestamp()) + 86400,
+    )
+
+
+def _last_close_before(series: dict, target_ts: int) -> float | None:
+    """Latest non-null close at or before target_ts. Timestamps are sorted
+    ascending, so bisect finds the bar in O(log T); walk back past nulls."""
+    timestamps, closes = series["timestamps"], series["closes"]
+    i = bisect.bisect_right(timestamps, target_ts) - 1
+    while i >= 0:
+        if closes[i] is not None:
+            return float(closes[i])
+        i -= 1
+    return None
+
+
+async def _fetch_actual_yf_async(session, semaphore, ticker: str, params: dict, target_ts: int) -> tuple:
+    """Fetch the last close on/before target_ts for one ticker. Returns (ticker, close_or_None)."""
+    async with semaphore:
+        try:
+            if session is None:
+                resp = await asyncio.to_thread(
+                    _SESSION.get, f"{YF_BASE}{ticker}", params=params, timeout=15,
+                )
+            else:
+                resp = await session.get(f"{YF_BASE}{ticker}", params=params, timeout=15)
+            if resp.status_code != 200:
+                return ticker, None
+            result = _loads(resp).get("chart", {}).get("result", [])
+            if not result:
+                return ticker, None
+            r          = result[0]
+            best_close = _last_close_before({
+                "timestamps": r.get("timestamp", []),
+                "closes":     r.get("indicators", {}).get("adjclose", [{}])[0].get("adjclose", []),
+            }, target_ts)
+            return ticker, (round(best_close, 2) if best_close is not None else None)
+        except Exception:
+            return ticker, None
+
+
+async def _fetch_actuals_all(tickers: list, params: dict, target_ts: int) -> list:
+    """Fetch actual closes for all tickers concurrently."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    if _HAS_CURL_CFFI:
+        async with curl_requests.AsyncSession(impersonate="chrome110", headers=YF_HEADERS) as session:
+            return await asyncio.gather(
+                *(_fetch_actual_yf_async(session, semaphore, t, params, target_ts) for t in tickers)
+            )
+    return await asyncio.gather(
+        *(_fetch_actual_yf_async(None, semaphore, t, params, target_ts) for t in tickers)
+    )
+
+
 def fetch_actual_prices(tickers: list, date_str: str) -> dict:
     """
     Fetch actual closing prices for a specific date.
@@ -363,42 +627,44 @@ def fetch_actual_prices(tickers: list, date_str: str) -> dict:
     """
     logger.info(f"Fetching actual prices for {date_str} ({len(tickers)} tickers)...")
 
-    target   = datetime.strptime(date_str, "%Y-%m-%d")
-    start_ts = int((target - timedelta(days=5)).timestamp())
-    end_ts   = int((target + timedelta(days=2)).timestamp())
-    target_ts = int(target.timestamp()) + 86400
+    start_ts, end_ts, target_ts = _date_window(date_str)
 
+    total      = len(tickers)
     actuals    = {}
     yf_missing = []
 
-    # Pass 1: Yahoo Finance
+    # Pass 0: cached closes — a historical close never changes, so any
+    # ticker resolved on an earlier run for this date skips the network.
+    remaining = []
     for ticker in tickers:
-        url    = f"{YF_BASE}{ticker}"
-        params = {"period1": start_ts, "period2": end_ts, "interval": "1d", "includePrePost": "false"}
-        try:
-            resp = _SESSION.get(url, headers=YF_HEADERS, params=params, timeout=15)
-            if resp.status_code != 200:
-                yf_missing.append(ticker)
-                continue
-            data   = resp.json()
-            result = data.get("chart", {}).get("result", [])
-            if not result:
+        cached = _ACTUALS_CACHE.get("actuals", f"{ticker}_{date_str}")
+        if cached is not None:
+            actuals[ticker] = cached
+        else:
+            remaining.append(ticker)
+    tickers = remaining
+
+    # Pass 1a: Yahoo spark — one request per 20 symbols instead of one each
+    for i in range(0, len(tickers), SPARK_BATCH_SIZE):
+        chunk  = tickers[i:i + SPARK_BATCH_SIZE]
+        series = _fetch_yf_spark_batch(chunk)
+        for ticker in chunk:
+            best = _last_close_before(series[ticker], target_ts) if ticker in series else None
+            if best is not None:
+                actuals[ticker] = round(best, 2)
+            else:
                 yf_missing.append(ticker)
-                continue
-            r          = result[0]
-            timestamps = r.get("timestamp", [])
-            closes     = r.get("indicators", {}).get("adjclose", [{}])[0].get("adjclose", [])
-            best_close = None
-            for ts, c in zip(timestamps, closes):
-                if ts <= target_ts and c is not None:
-                    best_close = float(c)
-            if best_close is not None:
-                actuals[ticker] = round(best_close, 2)
+
+    # Pass 1b: per-ticker chart calls for anything spark didn't cover
+    if yf_missing:
+        params  = {"period1": start_ts, "period2": end_ts, "interval": "1d", "includePrePost": "false"}
+        results = asyncio.run(_fetch_actuals_all(yf_missing, params, target_ts))
+        yf_missing = []
+        for ticker, close in results:
+            if close is not None:
+                actuals[ticker] = close
             else:
                 yf_missing.append(ticker)
-        except Exception:
-            yf_missing.append(ticker)
-        time.sleep(0.2)
 
     # Pass 2: FMP fallback for missing actuals
     if yf_missing:
@@ -409,7 +675,51 @@ def fetch_actual_prices(tickers: list, date_str: str) -> dict:
                 raw = _fetch_fmp_history(ticker, days=10)
                 if raw and raw["closes"]:
                     actuals[ticker] = round(raw["closes"][-1], 2)
-                time.sleep(0.3)
 
-    logger.info(f"Fetched actual prices for {len(actuals)}/{len(tickers)} tickers")
+    for ticker in tickers:
+        if ticker in actuals:
+            _ACTUALS_CACHE.set("actuals", f"{ticker}_{date_str}", actuals[ticker])
+
+    logger.info(f"Fetched actual prices for {len(actuals)}/{total} tickers")
     return actuals
+
+
+def fetch_actual_prices_multi(tickers: list, date_strs: list) -> dict:
+    """
+    Resolve closes for several recent dates from one set of series fetches.
+    A spark series spans a month of bars, so every requested date slices the
+    same response instead of re-downloading per date — main.py needs
+    yesterday plus the prev-close date and its weekend-fallback candidates.
+    Spark/cache hits only; callers top up any gaps on the dates they actually
+    use via fetch_actual_prices, which carries the chart and FMP fallbacks.
+    Returns {date_str: {ticker: close_price}}.
+    """
+    results = {d: {} for d in date_strs}
+    needed  = []
+    for ticker in tickers:
+        missing = False
+        for d in date_strs:
+            cached = _ACTUALS_CACHE.get("actuals", f"{ticker}_{d}")
+            if cached is not None:
+                results[d][ticker] = cached
+            else:
+                missing = True
+        if missing:
+            needed.append(ticker)
+
+    series = {}
+    for i in range(0, len(needed), SPARK_BATCH_SIZE):
+        series.update(_fetch_yf_spark_batch(needed[i:i + SPARK_BATCH_SIZE]))
+
+    for date_str in date_strs:
+        target_ts = _date_window(date_str)[2]
+        per_date  = results[date_str]
+        for ticker in needed:
+            if ticker in per_date or ticker not in series:
+                continue
+            best = _last_close_before(series[ticker], target_ts)
+            if best is not None:
+                per_date[ticker] = round(best, 2)
+                _ACTUALS_CACHE.set("actuals", f"{ticker}_{date_str}", per_date[ticker])
+
+    return results
@@ -15,12 +15,22 @@ This script is triggered daily at 6:00 AM CST by GitHub Actions cron.
 import os
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
+
+import numpy as np
 from dotenv import load_dotenv
 
 # Load environment variables from .env file (local dev only)
 load_dotenv()
 
+from fetcher import fetch_stock_data, fetch_actual_prices, fetch_actual_prices_multi
+from news import fetch_market_news
+from analyzer import analyze
+from database import save_predictions, get_predictions_for_date, get_actuals_for_date, save_actuals
+from exporter import build_frontend_json, write_json, fetch_index_data
+from notify import send_prediction_notification
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -36,11 +46,16 @@ def run():
     logger.info(f"Date: {date.today().isoformat()}")
     logger.info("=" * 60)
 
+    # Steps 1 and 2 hit different services and don't depend on each other,
+    # so the news fetch runs in a worker thread while the (larger) stock
+    # fetch runs here — that phase costs max() of the two instead of sum().
+    executor = ThreadPoolExecutor(max_workers=2)
+
     # ----------------------------------------------------------------
-    # STEP 1: Fetch stock data
+    # STEP 1: Fetch stock data (news fetch runs concurrently)
     # ----------------------------------------------------------------
-    logger.info("Step 1/6: Fetching stock data...")
-    from fetcher import fetch_stock_data, fetch_actual_prices
+    logger.info("Step 1/6: Fetching stock data (news fetch in background)...")
+    news_future = executor.submit(fetch_market_news)
     try:
         stock_data = fetch_stock_data()
     except RuntimeError as e:
@@ -54,18 +69,19 @@ def run():
     logger.info(f"Got data for {len(stock_data)} stocks.")
 
     # ----------------------------------------------------------------
-    # STEP 2: Fetch news
+    # STEP 2: Collect news
     # ----------------------------------------------------------------
-    logger.info("Step 2/6: Fetching news headlines...")
-    from news import fetch_market_news
-    news = fetch_market_news()
+    logger.info("Step 2/6: Collecting news headlines...")
+    news = news_future.result()
     logger.info(f"Got {len(news.get('macro', []))} macro headlines.")
 
     # ----------------------------------------------------------------
     # STEP 3: AI analysis (Claude + Gemini)
     # ----------------------------------------------------------------
     logger.info("Step 3/6: Running AI analysis (Claude + Gemini)...")
-    from analyzer import analyze
+    # The index quotes don't depend on the analysis, so fetch them while
+    # the model calls — the longest step in the pipeline — are in flight.
+    index_future = executor.submit(fetch_index_data)
     model_predictions = analyze(stock_data, news)
 
     if not model_predictions:
@@ -86,11 +102,11 @@ def run():
     # ----------------------------------------------------------------
     # STEP 4: Save today's predictions to Supabase
     # ----------------------------------------------------------------
+    # The predictions save doesn't depend on yesterday's actuals, so it
+    # runs in a worker thread while Step 5 does its own network passes;
+    # the result is collected before Step 6.
     logger.info("Step 4/6: Saving predictions to database...")
-    from database import save_predictions, get_predictions_for_date, get_actuals_for_date, save_actuals
-    saved = save_predictions(primary_predictions)
-    if not saved:
-        logger.warning("Failed to save predictions — continuing anyway.")
+    save_future = executor.submit(save_predictions, primary_predictions)
 
     # ----------------------------------------------------------------
     # STEP 5: Fetch yesterday's actuals and calculate accuracy
@@ -107,28 +123,40 @@ def run():
         )
 
         if all_tickers:
-            from datetime import timedelta as td
-            day_before_str = (date.today() - td(days=2)).isoformat()
+            # One window fetch covers yesterday, the prev-close date, and the
+            # weekend-fallback candidates — they all slice the same series
+            # instead of re-downloading per date.
+            prev_candidates = [(date.today() - timedelta(days=d)).isoformat() for d in range(2, 7)]
+            window = fetch_actual_prices_multi(all_tickers, [yesterday_str] + prev_candidates)
 
-            actual_prices = fetch_actual_prices(all_tickers, yesterday_str)
-            prev_prices   = fetch_actual_prices(all_tickers, day_before_str)
+            actual_prices = window[yesterday_str]
+            missing = [t for t in all_tickers if t not in actual_prices]
+            if missing:
+                actual_prices.update(fetch_actual_prices(missing, yesterday_str))
 
             # Weekend fallback — if yesterday was Monday, prev should be Friday
-            if not prev_prices:
-                for days_back in range(3, 7):
-                    fallback_str = (date.today() - td(days=days_back)).isoformat()
-                    prev_prices  = fetch_actual_prices(all_tickers, fallback_str)
-                    if prev_prices:
+            prev_prices = {}
+            for fallback_str in prev_candidates:
+                if window[fallback_str]:
+                    prev_prices = window[fallback_str]
+                    missing = [t for t in all_tickers if t not in prev_prices]
+                    if missing:
+                        prev_prices.update(fetch_actual_prices(missing, fallback_str))
+                    if fallback_str != prev_candidates[0]:
                         logger.info(f"Using {fallback_str} as previous close (weekend fallback).")
-                        break
-
-            actuals_pct = {}
-            for ticker in all_tickers:
-                if ticker in actual_prices and ticker in prev_prices:
-                    if prev_prices[ticker] > 0 and actual_prices[ticker] != prev_prices[ticker]:
-                        pct = ((actual_prices[ticker] - prev_prices[ticker]) / prev_prices[ticker]) * 100
-                        actuals_pct[ticker] = round(pct, 2)
-                        logger.info(f"  {ticker}: prev={prev_prices[ticker]}, actual={actual_prices[ticker]}, change={actuals_pct[ticker]:+.2f}%")
+                    break
+
+            # Percent changes in one vectorized pass over the tickers that
+            # have both prices, instead of per-ticker dict lookups + round()
+            common = [t for t in all_tickers if t in actual_prices and t in prev_prices]
+            a = np.fromiter((actual_prices[t] for t in common), dtype=np.float64, count=len(common))
+            p = np.fromiter((prev_prices[t]   for t in common), dtype=np.float64, count=len(common))
+            mask = (p > 0) & (a != p)
+            pcts = np.round((a - p) / np.where(mask, p, 1) * 100, 2)
+            actuals_pct = {t: pct for t, pct, ok in zip(common, pcts.tolist(), mask.tolist()) if ok}
+            for ticker, pct in actuals_pct.items():
+                logger.info("  %s: prev=%s, actual=%s, change=%+.2f%%",
+                            ticker, prev_prices[ticker], actual_prices[ticker], pct)
 
             actuals_list      = [{"ticker": t, "actual_change_pct": pct} for t, pct in actuals_pct.items()]
             yesterday_actuals = actuals_list
@@ -141,9 +169,11 @@ def run():
     # STEP 6: Export data.json for frontend
     # ----------------------------------------------------------------
     logger.info("Step 6/6: Exporting data.json...")
-    from exporter import build_frontend_json, write_json, fetch_index_data
+    if not save_future.result():
+        logger.warning("Failed to save predictions — continuing anyway.")
+    index_data = index_future.result()
+    executor.shutdown()
 
-    index_data = fetch_index_data()
     payload    = build_frontend_json(
         today_predictions      = primary_predictions,
         yesterday_predictions  = yesterday_predictions,
@@ -169,7 +199,6 @@ def run():
     push_to_github(os.getenv("OUTPUT_JSON_PATH", "./data.json"))
 
     # Send push notification (use primary predictions)
-    from notify import send_prediction_notification
     send_prediction_notification(
         winners=primary_predictions.get("winners", []),
         losers=primary_predictions.get("losers",  [])
@@ -179,9 +208,17 @@ def run():
 def push_to_github(json_path: str) -> bool:
     """
     Push data.json to the frontend GitHub repo so Vercel auto-redeploys
-    with fresh predictions after every daily run.
+    with fresh predictions after every daily run. Skips the upload when
+    the content is byte-identical to what's already on GitHub, so an
+    unchanged payload doesn't trigger a pointless commit + redeploy.
+
+    This pipeline is the sole writer of the remote file, so the blob SHA
+    from the last successful push is cached next to data.json and used
+    directly, skipping the GET probe; a 409/422 conflict (someone else
+    pushed) falls back to resolving the SHA remotely and retrying once.
     """
     import base64
+    import hashlib
     import requests
 
     token = os.getenv("GITHUB_TOKEN")
@@ -192,31 +229,62 @@ def push_to_github(json_path: str) -> bool:
         return False
 
     try:
-        with open(json_path, "r") as f:
+        with open(json_path, "rb") as f:
             content = f.read()
 
-        encoded = base64.b64encode(content.encode()).decode()
+        api_url   = f"https://api.github.com/repos/{repo}/contents/data.json"
+        sha_cache = json_path + ".sha"
 
-        api_url = f"https://api.github.com/repos/{repo}/contents/data.json"
-        headers = {
+        # GitHub's sha is the git blob SHA-1 — computable locally
+        local_sha = hashlib.sha1(b"blob %d\0%s" % (len(content), content)).hexdigest()
+
+        # One session for all calls — single TLS handshake to api.github.com
+        session = requests.Session()
+        session.headers.update({
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json",
-        }
+        })
+
+        def _remote_sha():
+            get_resp = session.get(api_url)
+            return get_resp.json().get("sha") if get_resp.status_code == 200 else None
 
-        # Check if file already exists (need SHA to update)
-        get_resp = requests.get(api_url, headers=headers)
-        sha = get_resp.json().get("sha") if get_resp.status_code == 200 else None
+        try:
+            with open(sha_cache) as f:
+                sha = f.read().strip() or None
+        except OSError:
+            sha = _remote_sha()
+
+        if local_sha == sha:
+            logger.info("data.json unchanged on GitHub — skipping push.")
+            return True
 
         payload = {
             "message": f"Update predictions {date.today().isoformat()}",
-            "content": encoded,
+            "content": base64.b64encode(content).decode(),
         }
         if sha:
             payload["sha"] = sha
 
-        put_resp = requests.put(api_url, headers=headers, json=payload)
+        put_resp = session.put(api_url, json=payload)
+
+        if put_resp.status_code in (409, 422):
+            # Cached SHA went stale — resolve against the live file and retry
+            sha = _remote_sha()
+            if local_sha == sha:
+                with open(sha_cache, "w") as f:
+                    f.write(local_sha)
+                logger.info("data.json unchanged on GitHub — skipping push.")
+                return True
+            if sha:
+                payload["sha"] = sha
+            else:
+                payload.pop("sha", None)
+            put_resp = session.put(api_url, json=payload)
 
         if put_resp.status_code in (200, 201):
+            with open(sha_cache, "w") as f:
+                f.write(local_sha)
             logger.info("data.json pushed to GitHub frontend repo successfully.")
             return True
         else:
@@ -5,6 +5,7 @@ Uses NewsAPI free tier (100 requests/day). We batch smartly to stay within limit
 
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from newsapi import NewsApiClient
 
@@ -36,26 +37,6 @@ def fetch_market_news() -> dict:
         "geopolitical trade war tariffs inflation",
     ]
 
-    macro_headlines = []
-    for query in macro_queries:
-        try:
-            resp = newsapi.get_everything(
-                q=query,
-                language="en",
-                from_param=from_date,
-                sort_by="relevancy",
-                page_size=10,
-            )
-            for article in resp.get("articles", []):
-                title = article.get("title", "")
-                desc = article.get("description", "")
-                if title and "[Removed]" not in title:
-                    macro_headlines.append(f"{title}. {desc or ''}".strip())
-        except Exception as e:
-            logger.warning(f"Macro news fetch failed for '{query}': {e}")
-
-    results["macro"] = macro_headlines[:20]  # cap at 20 headlines
-
     # --- 2. Sector-specific news ---
     sector_queries = {
         "technology": "tech stocks AI semiconductors earnings",
@@ -64,24 +45,55 @@ def fetch_market_news() -> dict:
         "finance": "bank stocks earnings interest rates",
     }
 
-    for sector, query in sector_queries.items():
-        try:
-            resp = newsapi.get_everything(
-                q=query,
-                language="en",
-                from_param=from_date,
-                sort_by="relevancy",
-                page_size=5,
-            )
-            headlines = []
-            for article in resp.get("articles", []):
-                title = article.get("title", "")
-                if title and "[Removed]" not in title:
-                    headlines.append(title)
-            results["sector"][sector] = headlines
-        except Exception as e:
-            logger.warning(f"Sector news fetch failed for '{sector}': {e}")
-            results["sector"][sector] = []
+    def _fetch_one(query: str, page_size: int) -> list:
+        resp = newsapi.get_everything(
+            q=query,
+            language="en",
+            from_param=from_date,
+            sort_by="relevancy",
+            page_size=page_size,
+        )
+        return resp.get("articles", [])
+
+    # All six queries are independent round-trips to newsapi.org — run them
+    # concurrently so the fetch costs one RTT instead of the sum of six.
+    with ThreadPoolExecutor(max_workers=len(macro_queries) + len(sector_queries)) as executor:
+        macro_futures  = {q: executor.submit(_fetch_one, q, 10) for q in macro_queries}
+        sector_futures = {s: executor.submit(_fetch_one, q, 5) for s, q in sector_queries.items()}
+
+        # The queries overlap, so the same article often comes back twice.
+        # Dedupe on normalized title before capping — duplicates would just
+        # burn AI prompt tokens on identical text downstream.
+        seen = set()
+        macro_headlines = []
+        for query, future in macro_futures.items():
+            try:
+                for article in future.result(timeout=15):
+                    title = article.get("title", "")
+                    desc = article.get("description", "")
+                    key = title.lower().strip()
+                    if title and "[Removed]" not in title and key not in seen:
+                        seen.add(key)
+                        macro_headlines.append(f"{title}. {desc or ''}".strip())
+            except Exception as e:
+                logger.warning(f"Macro news fetch failed for '{query}': {e}")
+
+        results["macro"] = macro_headlines[:20]  # cap at 20 headlines
+
+        for sector, future in sector_futures.items():
+            try:
+                headlines = []
+                seen_sector = set()
+                for article in future.result(timeout=15):
+                    title = article.get("title", "")
+                    key = title.lower().strip()
+                    if title and "[Removed]" not in title and key not in seen_sector:
+                        seen_sector.add(key)
+                        headlines.append(title)
+                results["sector"][sector] = headlines
+            except Exception as e:
+                logger.warning(f"Sector news fetch failed for '{sector}': {e}")
+                results["sector"][sector] = []
 
     total = len(results["macro"]) + sum(len(v) for v in results["sector"].values())
     logger.info(f"Fetched {total} news headlines across macro + 4 sectors.")
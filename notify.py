@@ -14,26 +14,58 @@ import os
 import json
 import time
 import logging
-import urllib.request
-import urllib.error
-import urllib.parse
 import base64
 
+import requests
+
 logger = logging.getLogger(__name__)
 
+# One session for the OAuth token exchange and the FCM send — both Google
+# endpoints, so the TLS connection gets reused across the two POSTs.
+_SESSION = requests.Session()
+
 FIREBASE_PROJECT_ID   = os.getenv("FIREBASE_PROJECT_ID", "stockcast-959fc")
 FIREBASE_CLIENT_EMAIL = os.getenv("FIREBASE_CLIENT_EMAIL", "")
 FIREBASE_PRIVATE_KEY  = os.getenv("FIREBASE_PRIVATE_KEY", "").replace("\\n", "\n")
 FIREBASE_TOPIC = "daily_predictions"
 
+# Google access tokens last ~1h; cache so repeated sends in one process
+# (retries, multiple notification types) skip the JWT sign + token POST.
+_TOKEN_CACHE = {"token": None, "exp": 0.0}
+
+_PRIVATE_KEY = None  # parsed lazily on first sign, then reused
+
+
+def _load_private_key():
+    """Parse the PEM service-account key once; PEM + ASN.1 decode isn't free."""
+    global _PRIVATE_KEY
+    if _PRIVATE_KEY is None:
+        from cryptography.hazmat.primitives import serialization
+
+        _PRIVATE_KEY = serialization.load_pem_private_key(
+            FIREBASE_PRIVATE_KEY.encode(), password=None
+        )
+    return _PRIVATE_KEY
+
 
 def _b64url(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
 
 
 def _make_jwt() -> str:
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec, padding, utils
+
+    # ES256 (ECDSA P-256) signs roughly an order of magnitude faster than
+    # RSA-2048 and produces a much smaller signature; Google's token
+    # endpoint accepts either. The algorithm is picked from the key type,
+    # so rotating the service account to an EC key enables it with no
+    # config change — RSA keys keep the existing RS256 path.
+    private_key = _load_private_key()
+    is_ec = isinstance(private_key, ec.EllipticCurvePrivateKey)
+
     now = int(time.time())
-    header  = _b64url(json.dumps({"alg": "RS256", "typ": "JWT"}).encode())
+    header  = _b64url(json.dumps({"alg": "ES256" if is_ec else "RS256", "typ": "JWT"}).encode())
     payload = _b64url(json.dumps({
         "iss": FIREBASE_CLIENT_EMAIL,
         "sub": FIREBASE_CLIENT_EMAIL,
@@ -45,31 +77,35 @@ def _make_jwt() -> str:
 
     signing_input = f"{header}.{payload}".encode()
 
-    from cryptography.hazmat.primitives import hashes, serialization
-    from cryptography.hazmat.primitives.asymmetric import padding
-
-    private_key = serialization.load_pem_private_key(
-        FIREBASE_PRIVATE_KEY.encode(), password=None
-    )
-    signature = private_key.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
+    if is_ec:
+        # JWS wants the raw fixed-width (r, s) pair, not the DER wrapper
+        der  = private_key.sign(signing_input, ec.ECDSA(hashes.SHA256()))
+        r, s = utils.decode_dss_signature(der)
+        signature = r.to_bytes(32, "big") + s.to_bytes(32, "big")
+    else:
+        signature = private_key.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
     return f"{header}.{payload}.{_b64url(signature)}"
 
 
 def _get_access_token() -> str:
+    # 60s safety margin so we never hand out a token about to expire
+    if _TOKEN_CACHE["token"] and time.time() < _TOKEN_CACHE["exp"] - 60:
+        return _TOKEN_CACHE["token"]
+
     jwt = _make_jwt()
-    data = urllib.parse.urlencode({
-        "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
-        "assertion": jwt,
-    }).encode()
-    req = urllib.request.Request(
+    resp = _SESSION.post(
         "https://oauth2.googleapis.com/token",
-        data=data,
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-        method="POST"
+        data={
+            "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
+            "assertion": jwt,
+        },
+        timeout=10,
     )
-    with urllib.request.urlopen(req, timeout=10) as resp:
-        result = json.loads(resp.read().decode())
-        return result["access_token"]
+    resp.raise_for_status()
+    result = resp.json()
+    _TOKEN_CACHE["token"] = result["access_token"]
+    _TOKEN_CACHE["exp"]   = time.time() + result.get("expires_in", 3600)
+    return _TOKEN_CACHE["token"]
 
 
 def send_prediction_notification(winners: list, losers: list) -> bool:
@@ -98,7 +134,7 @@ def send_prediction_notification(winners: list, losers: list) -> bool:
 
     fcm_url = f"https://fcm.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/messages:send"
 
-    payload = json.dumps({
+    payload = {
         "message": {
             "topic": FIREBASE_TOPIC,
             "notification": {
@@ -119,26 +155,21 @@ def send_prediction_notification(winners: list, losers: list) -> bool:
             },
             "data": {"type": "daily_predictions"}
         }
-    }).encode()
+    }
 
     try:
-        req = urllib.request.Request(
+        resp = _SESSION.post(
             fcm_url,
-            data=payload,
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json",
-            },
-            method="POST"
+            json=payload,
+            headers={"Authorization": f"Bearer {access_token}"},
+            timeout=10,
         )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            result = json.loads(resp.read().decode())
-            logger.info(f"Push notification sent: {result.get('name', 'ok')}")
-            return True
+        if resp.status_code != 200:
+            logger.error(f"FCM error {resp.status_code}: {resp.text}")
+            return False
+        logger.info(f"Push notification sent: {resp.json().get('name', 'ok')}")
+        return True
 
-    except urllib.error.HTTPError as e:
-        logger.error(f"FCM error {e.code}: {e.read().decode()}")
-        return False
     except Exception as e:
         logger.error(f"Failed to send push notification: {e}")
         return False